@@ -0,0 +1,14 @@
+# Import libraries
+import numpy as np
+
+
+def cdf(x, nb=32):
+    """Return (edges, cdf %) of x over nb uniform bins spanning its own [min, max]"""
+    vmin, vmax = x.min(), x.max()
+    if vmax == vmin:
+        vmin, vmax = vmin - 0.5, vmax + 0.5
+    idx = ((x - vmin) * (nb/(vmax-vmin))).astype(np.int32)
+    np.clip(idx, 0, nb-1, out=idx)
+    counts = np.cumsum(np.bincount(idx, minlength=nb), dtype=np.float64)
+    counts *= 100/counts[-1]
+    return vmin + np.arange(1, nb+1) * (vmax-vmin)/nb, counts
@@ -1,6 +1,7 @@
 import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
+from cdf import cdf
 
 # Define conductances
 CONDS = np.arange(0, 129e-6, 4e-6)
@@ -11,24 +12,21 @@ print(CONDS)
 names = ["addr", "rf"]
 
 data = pd.read_csv("../data/newwrite.tsv", names=names, sep='\t')
-data["gf"] = 1/data["rf"]
-data["bin"] = np.floor(data["gf"] / 4e-6)
-data["targbin"] = ((data["addr"] - data["addr"][0]) / 2) % 32
-matdata = data["bin"].values.reshape(32,32)
+data["gf"] = np.reciprocal(data["rf"].values.astype(np.float32))
+data["bin"] = (data["gf"].values.astype(np.float32, copy=False) * np.float32(1/4e-6)).astype(np.int16)
+addr = data["addr"].values
+data["targbin"] = (((addr - addr[0]) >> 1) & 31).astype(np.int8)
+matdata = data["bin"].to_numpy(dtype=np.int16, copy=False).reshape(32,32)
 plt.matshow(matdata, vmin=0, vmax=32)
 plt.show()
 
-plt.figure(figsize=(4,3))
-plt.xlim(0, 150)
-plt.title('Post-Prog. READ Conductance Dist.')
-for i in range(32):
-    rdata = data[data['targbin'] == i]
-    counts, bin_edges = np.histogram(rdata['gf']*1e6, bins=32, density=True)
-    cdf = np.cumsum(counts)
-    plt.plot(bin_edges[1:], cdf/cdf[-1]*100)
-plt.xlabel('Conductance (uS)')
-plt.ylabel('CDF (%)')
-plt.tight_layout()
-plt.savefig('figs/mb-cdf.pdf')
+fig, ax = plt.subplots(figsize=(4,3), tight_layout=True)
+ax.set_xlim(0, 150)
+ax.set_title('Post-Prog. READ Conductance Dist.')
+for _, rdata in data.groupby('targbin', sort=True)['gf']:
+    ax.plot(*cdf(rdata.values*1e6))
+ax.set_xlabel('Conductance (uS)')
+ax.set_ylabel('CDF (%)')
+fig.savefig('figs/mb-cdf.pdf')
 
 print(data[data["targbin"] == 0])
@@ -1,26 +1,41 @@
 # Import libraries
-import matplotlib.pyplot as plt, numpy as np, pandas as pd
+import matplotlib as mpl, numpy as np, pandas as pd
 
 # Load bitstream as matrix
-data = pd.read_csv(open("../data/1us_endurance.tsv"), sep="\t", names=["addr", "Ri", "Rf", "cycle"])
+cols = ["addr", "Ri", "Rf", "cycle"]
+dtypes = {
+    "addr": np.int32,
+    "Ri": np.float32,
+    "Rf": np.float32,
+    "cycle": np.int64
+}
+data = pd.read_csv("../data/1us_endurance.tsv", sep="\t", names=cols, dtype=dtypes, engine="c", memory_map=True)
+cycle = data["cycle"].values
+ri, rf = data["Ri"].values, data["Rf"].values
 
-plt.figure(figsize=(4,3))
-plt.xlabel("Cycle")
-plt.ylabel("Resistance (kOhm)")
-plt.xlim(1e2, 1e6)
-plt.ylim(0, 100)
-plt.xscale('log')
-plt.plot(data["cycle"], data["Ri"]/1000, ".")
-plt.plot(data["cycle"], data["Rf"]/1000, ".")
-plt.tight_layout()
-plt.savefig("figs/endurance-R.pdf")
+# Figures are only saved, so load pyplot late on the non-interactive backend
+mpl.use('Agg')
+import matplotlib.pyplot as plt
 
-plt.figure(figsize=(4,3))
-plt.xlabel("Cycle")
-plt.ylabel("Conductance (uS)")
-plt.xlim(1e2, 1e6)
-plt.xscale('log')
-plt.plot(data["cycle"], 1e6/data["Ri"], ".")
-plt.plot(data["cycle"], 1e6/data["Rf"], ".")
-plt.tight_layout()
-plt.savefig("figs/endurance-G.pdf")
+fig, ax = plt.subplots(figsize=(4,3), tight_layout=True)
+ax.set_xlabel("Cycle")
+ax.set_ylabel("Resistance (kOhm)")
+ax.set_xlim(1e2, 1e6)
+ax.set_ylim(0, 100)
+ax.set_xscale('log')
+ax.plot(cycle, ri/1000, ".", rasterized=True)
+ax.plot(cycle, rf/1000, ".", rasterized=True)
+fig.savefig("figs/endurance-R.pdf")
+
+# Conductance (uS), computed once per column
+gi = np.reciprocal(ri, dtype=np.float32) * np.float32(1e6)
+gf = np.reciprocal(rf, dtype=np.float32) * np.float32(1e6)
+
+fig, ax = plt.subplots(figsize=(4,3), tight_layout=True)
+ax.set_xlabel("Cycle")
+ax.set_ylabel("Conductance (uS)")
+ax.set_xlim(1e2, 1e6)
+ax.set_xscale('log')
+ax.plot(cycle, gi, ".", rasterized=True)
+ax.plot(cycle, gf, ".", rasterized=True)
+fig.savefig("figs/endurance-G.pdf")
@@ -1,10 +1,11 @@
 import matplotlib.pyplot as plt
 import pandas as pd, numpy as np
+from cdf import cdf
 
 # names = ["addr", "time", "r", "g"]
 names = ["addr", "r"]
 data = pd.read_csv("../data/newwrite.tsv", sep='\t', names=names)
-data["g"] = 1/data["r"]
+data["g"] = np.reciprocal(data["r"].values.astype(np.float32))
 #print(data)
 # gdata = data.groupby("addr")
 # data["t0"] = gdata["time"].transform(lambda t: t - t.min())
@@ -17,25 +18,22 @@ data["g"] = 1/data["r"]
 
 # for data in [firstdata, lastdata]:
 for data in [data]:
-    data["bin"] = np.floor(data["g"] / 4e-6)
-    data["targbin"] = ((data["addr"] - data["addr"][0]) / 2) % 32
-    matdata = data["bin"].values.reshape(32,32)
+    data["bin"] = (data["g"].values.astype(np.float32, copy=False) * np.float32(1/4e-6)).astype(np.int16)
+    addr = data["addr"].values
+    data["targbin"] = (((addr - addr[0]) >> 1) & 31).astype(np.int8)
+    matdata = data["bin"].to_numpy(dtype=np.int16, copy=False).reshape(32,32)
     plt.matshow(matdata, vmin=0, vmax=32)
-    for i in range(len(matdata)):
-        for j in range(len(matdata[0])):
-            c = int(matdata[j,i])
-            plt.text(i, j, str(c), va='center', ha='center')
+    labels = np.char.mod('%d', matdata)
+    ax = plt.gca()
+    for j, i in np.ndindex(labels.shape):
+        ax.text(i, j, labels[j,i], va='center', ha='center')
     plt.show()
 
-    plt.figure(figsize=(4,3))
-    plt.xlim(0, 150)
-    plt.title('Post-Prog. READ Conductance Dist.')
-    for i in range(32):
-        rdata = data[data['targbin'] == i]
-        counts, bin_edges = np.histogram(rdata['g']*1e6, bins=32, density=True)
-        cdf = np.cumsum(counts)
-        plt.plot(bin_edges[1:], cdf/cdf[-1]*100)
-    plt.xlabel('Conductance (uS)')
-    plt.ylabel('CDF (%)')
-    plt.tight_layout()
+    fig, ax = plt.subplots(figsize=(4,3), tight_layout=True)
+    ax.set_xlim(0, 150)
+    ax.set_title('Post-Prog. READ Conductance Dist.')
+    for _, rdata in data.groupby('targbin', sort=True)['g']:
+        ax.plot(*cdf(rdata.values*1e6))
+    ax.set_xlabel('Conductance (uS)')
+    ax.set_ylabel('CDF (%)')
     plt.show()
@@ -4,9 +4,12 @@ import pandas as pd, numpy as np
 names = ["addr", "i", "v"]
 data = pd.read_csv("../data/read_multivolt.tsv", sep='\t', names=names)
 data["g"] = data["i"] / data["v"]
-data["targbin"] = ((data["addr"] - data["addr"][0]) / 2) % 32
+addr = data["addr"].values
+data["targbin"] = (((addr - addr[0]) >> 1) & 31).astype(np.int8)
+data["v"] = data["v"].astype(np.float32)
 
-for targbin in range(32):
-    gdata = data[data["targbin"] == targbin].groupby(["v"])
-    plt.plot(gdata["v"].mean(), gdata["i"].mean())
+# Mean I-V per target bin in a single two-key aggregation
+agg = data.groupby(["targbin", "v"], sort=True)["i"].mean()
+for targbin, sub in agg.groupby(level=0):
+    plt.plot(sub.index.get_level_values("v"), sub.values)
 plt.show()
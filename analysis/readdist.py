@@ -1,13 +1,17 @@
 # Import libraries
-import matplotlib.pyplot as plt, numpy as np, pandas as pd
+import matplotlib as mpl, numpy as np, pandas as pd
+from cdf import cdf
 
 # Chip ID
 CHIP = 'C3'
 tsv_file = 'read.tsv'
 
+# Number of CDF bins
+NBINS = 65536
+
 # Load bitstream
-bs = np.loadtxt(open("../bitstream/vectors_bitstream.txt"), dtype=np.int32)
-# bs = np.loadtxt(open("../bitstream/vectors_bitstream_2.txt"), dtype=np.int32)
+bs = np.loadtxt("../bitstream/vectors_bitstream.txt", dtype=np.int32)
+# bs = np.loadtxt("../bitstream/vectors_bitstream_2.txt", dtype=np.int32)
 
 # Load target output as dataframe
 cols = ['addr', 'R']
@@ -15,33 +19,34 @@ dtypes = {
     'addr': np.int32,
     'R': np.float64
 }
-data = pd.read_csv(f'../log/{CHIP}/{tsv_file}', names=cols, sep='\t', dtype=dtypes, index_col='addr')
-data['bin'] = bs[:len(data)]
+data = pd.read_csv(f'../log/{CHIP}/{tsv_file}', names=cols, sep='\t', dtype=dtypes)
+data['bin'] = bs[:len(data)].astype(np.int8)
+
+# Split resistance (kOhm) and conductance (uS) by bit once, shared by both figures
+r_kohm = data['R'].values/1000
+g_us = np.reciprocal(r_kohm.astype(np.float32)) * np.float32(1e3)
+bit_idx = [np.flatnonzero(data['bin'].values == i) for i in range(2)]
+
+# Figures are only saved, so load pyplot late on the non-interactive backend
+mpl.use('Agg')
+import matplotlib.pyplot as plt
 
 # CDF curves
-plt.figure(figsize=(4,3))
-plt.xlim(5, 1e3)
-plt.xscale('log')
-plt.title('Post-Prog. READ Resistance Dist.')
-for i in range(2):
-    rdata = data[data['bin'] == i]
-    counts, bin_edges = np.histogram(rdata['R']/1000, bins=65536, density=True)
-    cdf = np.cumsum(counts)
-    plt.plot(bin_edges[1:], cdf/cdf[-1]*100)
-plt.xlabel('Resistance (kOhm)')
-plt.ylabel('CDF (%)')
-plt.tight_layout()
-plt.savefig('figs/progread-cdf.pdf')
-
-plt.figure(figsize=(4,3))
-plt.xlim(0, 150)
-plt.title('Post-Prog. READ Conductance Dist.')
-for i in range(2):
-    rdata = data[data['bin'] == i]
-    counts, bin_edges = np.histogram(1e6/rdata['R'], bins=65536, density=True)
-    cdf = np.cumsum(counts)
-    plt.plot(bin_edges[1:], cdf/cdf[-1]*100)
-plt.xlabel('Conductance (uS)')
-plt.ylabel('CDF (%)')
-plt.tight_layout()
-plt.savefig('figs/progread-g-cdf.pdf')
+fig, ax = plt.subplots(figsize=(4,3), tight_layout=True)
+ax.set_xlim(5, 1e3)
+ax.set_xscale('log')
+ax.set_title('Post-Prog. READ Resistance Dist.')
+for idx in bit_idx:
+    ax.plot(*cdf(r_kohm[idx], NBINS))
+ax.set_xlabel('Resistance (kOhm)')
+ax.set_ylabel('CDF (%)')
+fig.savefig('figs/progread-cdf.pdf')
+
+fig, ax = plt.subplots(figsize=(4,3), tight_layout=True)
+ax.set_xlim(0, 150)
+ax.set_title('Post-Prog. READ Conductance Dist.')
+for idx in bit_idx:
+    ax.plot(*cdf(g_us[idx], NBINS))
+ax.set_xlabel('Conductance (uS)')
+ax.set_ylabel('CDF (%)')
+fig.savefig('figs/progread-g-cdf.pdf')
@@ -1,4 +1,5 @@
-import matplotlib.pyplot as plt
+import os
+import matplotlib as mpl
 import numpy as np
 import pandas as pd
 
@@ -15,17 +16,28 @@ dtypes = {
 }
 
 
-data = pd.read_csv(f'../log/{CHIP_ID}/{tsv_file}', names=cols, sep='\t', dtype=dtypes, index_col='addr')
+# Parse the TSV once and reuse a .npy cache until the log changes
+tsv_path = f'../log/{CHIP_ID}/{tsv_file}'
+cache_path = tsv_path + '.npy'
+if os.path.exists(cache_path) and os.path.getmtime(cache_path) >= os.path.getmtime(tsv_path):
+    r = np.load(cache_path, mmap_mode='r')
+else:
+    data = pd.read_csv(tsv_path, names=cols, sep='\t', dtype=dtypes, index_col='addr')
+    r = data['R'].values
+    np.save(cache_path, r)
+
+r_mat = r.reshape(256, 256) / 1000 # kOhm
 
-r_mat = data['R'].values.reshape(256, 256) / 1000 # kOhm
+# Figures are only saved, so load pyplot late on the non-interactive backend
+mpl.use('Agg')
+import matplotlib.pyplot as plt
 
-fig = plt.figure()
-mat = plt.gca().matshow(r_mat, vmin=8, vmax=500)
-cbar = plt.colorbar(mat)
+fig, ax = plt.subplots(tight_layout=True)
+mat = ax.matshow(r_mat, vmin=8, vmax=500)
+cbar = fig.colorbar(mat)
 cbar.set_label('Resistance (KOhm', rotation=270)
-plt.xlabel('BL/SL #')
-plt.ylabel('WL #')
-plt.xticks(np.arange(0, 257, 64))
-plt.yticks(np.arange(0, 257, 64))
-plt.tight_layout()
-plt.savefig('./figs/res_matrix.pdf')
+ax.set_xlabel('BL/SL #')
+ax.set_ylabel('WL #')
+ax.set_xticks(np.arange(0, 257, 64))
+ax.set_yticks(np.arange(0, 257, 64))
+fig.savefig('./figs/res_matrix.pdf')
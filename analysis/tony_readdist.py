@@ -6,8 +6,8 @@ CHIP = 'C3'
 tsv_file = 'read.tsv'
 
 # Load bitstream
-bs = np.loadtxt(open("../bitstream/vectors_bitstream.txt"), dtype=np.int32)
-# bs = np.loadtxt(open("../bitstream/vectors_bitstream_2.txt"), dtype=np.int32)
+bs = np.loadtxt("../bitstream/vectors_bitstream.txt", dtype=np.int32)
+# bs = np.loadtxt("../bitstream/vectors_bitstream_2.txt", dtype=np.int32)
 
 # Load target output as dataframe
 cols = ['addr', 'R']
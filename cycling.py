@@ -13,10 +13,11 @@ parser.add_argument("--end-addr", type=int, default=128, help="end addr")
 parser.add_argument("--step-addr", type=int, default=1, help="addr step")
 parser.add_argument("--iterations", type=int, default=50, help="number of cycles to iterate")
 parser.add_argument("--readiter", type=int, default=25, help="number of cycles to read after")
+parser.add_argument("--quiet", action="store_true", help="do not echo each measurement")
 args = parser.parse_args()
 
 # Open outfile
-outfile = open(args.outfile, "a")
+outfile = open(args.outfile, "a", buffering=1<<16)
 
 # Initialize NI system
 nisys = NIRRAM(args.chipname, "settings/slc.json")
@@ -32,8 +33,10 @@ for addr in range(args.start_addr, args.end_addr, args.step_addr):
         nisys.reset_pulse()
         if i % args.readiter == (args.readiter-1):
             final = nisys.read()
-            print(f"{addr}\t{initial[0]}\t{final[0]}\t{i+1}\n")
+            if not args.quiet:
+                print(f"{addr}\t{initial[0]}\t{final[0]}\t{i+1}\n")
             outfile.write(f"{addr}\t{initial[0]}\t{final[0]}\t{i+1}\n")
+    outfile.flush()
 
 # Shutdown
 outfile.close()
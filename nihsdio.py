@@ -24,6 +24,7 @@ class NIHSDIO:
         self.device_id = deviceID
         self.chans = channelList
         self.chan_map = chanMap if chanMap is not None else {}
+        self.bit_cache = {}
 
         # Create driver and VI session
         self.driver = CDLL("dll/niHSDIO_64.dll")
@@ -72,32 +73,39 @@ class NIHSDIO:
         """Wrapper function: close NI-HSDIO session"""
         self.check_err(self.driver.niHSDIO_close(self.sess))
 
-    def write_data_across_chans(self, chans, data, debug=False):
-        """Writes a pattern across channels. If chans is a string, it is interpreted as a
-        channel map key. If chans is a list, it will be directly interpreted as the channels.
-        data will be interpreted as an unsigned 32-bit integer."""
-        # Type checking and conversion
+    def reorder_bits(self, chans, data):
+        """Maps the bits of data onto channels for static generation. If chans is a string, it is
+        interpreted as a channel map key. Returns tuple (write_data, mask)."""
+        # Channel map patterns are cached since the same few values are written repeatedly
         if isinstance(chans, str):
-            chans = self.chan_map[chans]
+            key = (chans, data)
+            if key not in self.bit_cache:
+                self.bit_cache[key] = self.reorder_bits(self.chan_map[chans], data)
+            return self.bit_cache[key]
         if not isinstance(chans, list):
             err = f"Channels must be specified as (or mapped to) a list: got {repr(chans)}."
             raise NIHSDIOException(err)
 
-        # Convert data to binary string for bit access
-        data = format(data, '032b')[::-1]
-
-        # Reorder bits for static generation
+        # Reorder bits for static generation (bit i of data goes to chans[i])
         write_data = 0
         mask = 0
-        for chan, bit in zip(chans, data):
+        for i, chan in enumerate(chans[:32]):
             mask |= (1 << chan)
-            write_data |= (int(bit) << chan)
+            write_data |= ((data >> i) & 1) << chan
+        return write_data, mask
+
+    def write_data_across_chans(self, chans, data, debug=False):
+        """Writes a pattern across channels. If chans is a string, it is interpreted as a
+        channel map key. If chans is a list, it will be directly interpreted as the channels.
+        data will be interpreted as an unsigned 32-bit integer."""
+        # Reorder bits for static generation
+        write_data, mask = self.reorder_bits(chans, data)
 
         # Debug statements
         if debug:
             print("Write data:", write_data)
             print("Mask:", mask)
-            print("Original data binary:", data[::-1])
+            print("Original data binary:", format(data, '032b'))
             print("Write data binary:", format(write_data, '032b'))
             print("Mask binary:", format(mask, '032b'))
             print()
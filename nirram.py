@@ -1,4 +1,5 @@
 """Defines the NI RRAM controller class"""
+import itertools
 import json
 import time
 import warnings
@@ -6,13 +7,10 @@ import nidaqmx
 import nidcpower
 import nifgen
 import numpy as np
+from nidaqmx.stream_readers import AnalogSingleChannelReader
 from nihsdio import NIHSDIO, NIHSDIOException
 
 
-# Warnings become errors
-warnings.filterwarnings("error")
-
-
 def accurate_delay(delay):
     """Function to provide accurate time delay"""
     _ = time.perf_counter() + delay
@@ -20,6 +18,13 @@ def accurate_delay(delay):
         pass
 
 
+def stop_task(task):
+    """Stop an NI-DAQmx task, ignoring the warning raised when stopping a finished task"""
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", nidaqmx.errors.DaqWarning)
+        task.stop()
+
+
 class NIRRAMException(Exception):
     """Exception produced by the NIRRAM class"""
     def __init__(self, msg):
@@ -39,8 +44,8 @@ class NIRRAM:
             raise NIRRAMException(f"Settings should be a dict, got {repr(settings)}.")
 
         # Initialize RRAM logging
-        self.mlogfile = open(settings["master_log_file"], "a")
-        self.plogfile = open(settings["prog_log_file"], "a")
+        self.mlogfile = open(settings["master_log_file"], "a", buffering=1<<16)
+        self.plogfile = open(settings["prog_log_file"], "a", buffering=1<<16)
         self.mlogfile.write(f"INIT {chip}\n")
 
         # Store/initialize parameters
@@ -48,6 +53,7 @@ class NIRRAM:
         self.chip = chip
         self.addr = 0
         self.prof = {"READs": 0, "SETs": 0, "RESETs": 0}
+        self.sweeps = {}
 
         # Initialize NI-HSDIO driver
         self.hsdio = NIHSDIO(**settings["HSDIO"])
@@ -57,6 +63,8 @@ class NIRRAM:
         self.read_chan.ai_channels.add_ai_voltage_chan(settings["DAQmx"]["chanMap"]["read_ai"])
         read_rate, spc = settings["READ"]["read_rate"], settings["READ"]["n_samples"]
         self.read_chan.timing.cfg_samp_clk_timing(read_rate, samps_per_chan=spc)
+        self.read_reader = AnalogSingleChannelReader(self.read_chan.in_stream)
+        self.read_buf = np.empty(spc)
 
         # Initialize NI-DAQmx driver for WL voltages
         self.wl_ext_chans = []
@@ -65,6 +73,12 @@ class NIRRAM:
             task.ao_channels.add_ao_voltage_chan(chan)
             task.timing.cfg_samp_clk_timing(settings["samp_clk_rate"], samps_per_chan=2)
             self.wl_ext_chans.append(task)
+        self.wl_zero_signal = np.zeros((2, 2))
+        self.wl_ext_rates = [settings["samp_clk_rate"]]*len(self.wl_ext_chans)
+        # Whether each WL card is known to hold zero. Skipping the inactive-card write relies on
+        # an AO card holding its last generated sample after stop(), so a card whose last
+        # sample was zero stays at zero until it is written again.
+        self.wl_ext_zero = [False]*len(self.wl_ext_chans)
 
         # Initialize NI-DCPower driver for BL voltages
         self.bl_ext_chans = []
@@ -75,12 +89,14 @@ class NIRRAM:
             sess.commit()
             sess.initiate()
             self.bl_ext_chans.append(sess)
+        self.bl_ext_levels = [0]*len(self.bl_ext_chans)
 
         # Initialize NI-FGen driver for SL voltage
         self.sl_ext_chan = nifgen.Session(settings["FGen"]["deviceID"])
         self.sl_ext_chan.output_mode = nifgen.OutputMode.FUNC
         self.sl_ext_chan.configure_standard_waveform(nifgen.Waveform.DC, 0.0, frequency=10000000)
         self.sl_ext_chan.initiate()
+        self.sl_ext_level = 0
 
         # Set address to 0
         self.set_addr(0)
@@ -88,6 +104,10 @@ class NIRRAM:
 
     def read(self):
         """Perform a READ operation. Returns tuple with (res, cond, meas_i, meas_v)"""
+        # Get settings (looked up per call since scripts may sweep them)
+        cfg = self.settings["READ"]
+        vbl, shunt_res = cfg["VBL"], cfg["shunt_res_value"]
+
         # Increment the number of READs
         self.prof["READs"] += 1
 
@@ -96,19 +116,20 @@ class NIRRAM:
 
         # Set voltages
         self.set_vsl(0)
-        self.set_vbl(self.settings["READ"]["VBL"])
-        self.set_vwl(self.settings["READ"]["VWL"])
+        self.set_vbl(vbl)
+        self.set_vwl(cfg["VWL"])
 
         # Settling time for VBL
-        accurate_delay(self.settings["READ"]["settling_time"])
+        accurate_delay(cfg["settling_time"])
 
         # Measure
         self.read_chan.start()
-        meas_v = np.mean(self.read_chan.read(self.settings["READ"]["n_samples"]))
+        self.read_reader.read_many_sample(self.read_buf, len(self.read_buf))
+        meas_v = self.read_buf.mean()
         self.read_chan.wait_until_done()
         self.read_chan.stop()
-        meas_i = meas_v/self.settings["READ"]["shunt_res_value"] + self.settings["READ"]["current_offset"]
-        res = np.abs(self.settings["READ"]["VBL"]/meas_i - self.settings["READ"]["shunt_res_value"])
+        meas_i = meas_v/shunt_res + cfg["current_offset"]
+        res = np.abs(vbl/meas_i - shunt_res)
         cond = 1/res
 
         # Turn off VBL and VWL
@@ -127,9 +148,10 @@ class NIRRAM:
     def form_pulse(self, vwl=None, vbl=None, pulse_width=None):
         """Perform a FORM operation."""
         # Get parameters
-        vwl = self.settings["FORM"]["VWL"] if vwl is None else vwl
-        vbl = self.settings["FORM"]["VBL"] if vbl is None else vbl
-        pulse_width = self.settings["FORM"]["PW"] if pulse_width is None else pulse_width
+        cfg = self.settings["FORM"]
+        vwl = cfg["VWL"] if vwl is None else vwl
+        vbl = cfg["VBL"] if vbl is None else vbl
+        pulse_width = cfg["PW"] if pulse_width is None else pulse_width
 
         # Operation is equivalent to SET but with different parameters
         self.set_pulse(vwl, vbl, pulse_width)
@@ -137,9 +159,10 @@ class NIRRAM:
     def set_pulse(self, vwl=None, vbl=None, pulse_width=None):
         """Perform a SET operation."""
         # Get parameters
-        vwl = self.settings["SET"]["VWL"] if vwl is None else vwl
-        vbl = self.settings["SET"]["VBL"] if vbl is None else vbl
-        pulse_width = self.settings["SET"]["PW"] if pulse_width is None else pulse_width
+        cfg = self.settings["SET"]
+        vwl = cfg["VWL"] if vwl is None else vwl
+        vbl = cfg["VBL"] if vbl is None else vbl
+        pulse_width = cfg["PW"] if pulse_width is None else pulse_width
 
         # Increment the number of SETs
         self.prof["SETs"] += 1
@@ -152,7 +175,7 @@ class NIRRAM:
         self.set_vbl(vbl)
 
         # Settling time for VBL
-        accurate_delay(self.settings["SET"]["settling_time"])
+        accurate_delay(cfg["settling_time"])
 
         # Pulse VWL
         self.pulse_vwl(vwl, pulse_width)
@@ -161,7 +184,7 @@ class NIRRAM:
         self.set_vbl(0)
 
         # Settling time for VBL
-        accurate_delay(self.settings["SET"]["settling_time"])
+        accurate_delay(cfg["settling_time"])
 
         # Address decoder disable
         self.decoder_disable()
@@ -172,9 +195,10 @@ class NIRRAM:
     def reset_pulse(self, vwl=None, vsl=None, pulse_width=None):
         """Perform a RESET operation."""
         # Get parameters
-        vwl = self.settings["RESET"]["VWL"] if vwl is None else vwl
-        vsl = self.settings["RESET"]["VSL"] if vsl is None else vsl
-        pulse_width = self.settings["RESET"]["PW"] if pulse_width is None else pulse_width
+        cfg = self.settings["RESET"]
+        vwl = cfg["VWL"] if vwl is None else vwl
+        vsl = cfg["VSL"] if vsl is None else vsl
+        pulse_width = cfg["PW"] if pulse_width is None else pulse_width
 
         # Increment the number of SETs
         self.prof["RESETs"] += 1
@@ -187,7 +211,7 @@ class NIRRAM:
         self.set_vsl(vsl)
 
         # Settling time for VSL
-        accurate_delay(self.settings["RESET"]["settling_time"])
+        accurate_delay(cfg["settling_time"])
 
         # Pulse VWL
         self.pulse_vwl(vwl, pulse_width)
@@ -196,7 +220,7 @@ class NIRRAM:
         self.set_vsl(0)
 
         # Settling time for VSL
-        accurate_delay(self.settings["RESET"]["settling_time"])
+        accurate_delay(cfg["settling_time"])
 
         # Address decoder disable
         self.decoder_disable()
@@ -207,46 +231,49 @@ class NIRRAM:
 
     def set_vsl(self, voltage):
         """Set VSL using NI-FGen driver"""
+        # Skip if already at the requested level
+        if self.sl_ext_level == voltage:
+            return
+
         # Set DC offset to V/2 since it is doubled by FGen for some reason
         self.sl_ext_chan.func_dc_offset = voltage/2
+        self.sl_ext_level = voltage
 
     def set_vbl(self, voltage):
         """Set (active) VBL using NI-DCPower driver (inactive disabled)"""
-        # LSB indicates active BL channel
-        active_bl_chan = (self.addr >> 0) & 0b1
-        active_bl = self.bl_ext_chans[active_bl_chan]
-        inactive_bl = self.bl_ext_chans[1-active_bl_chan]
-
-        # Set voltages and commit
-        inactive_bl.voltage_level = 0
-        inactive_bl.commit()
-        active_bl.voltage_level = voltage
-        active_bl.commit()
-        inactive_bl.wait_for_event(nidcpower.Event.SOURCE_COMPLETE)
-        active_bl.wait_for_event(nidcpower.Event.SOURCE_COMPLETE)
+        active_bl_chan = self.active_bl_chan
+
+        # Set voltages and commit, skipping channels already at the requested level
+        committed = []
+        for chan, level in ((1-active_bl_chan, 0), (active_bl_chan, voltage)):
+            if self.bl_ext_levels[chan] != level:
+                sess = self.bl_ext_chans[chan]
+                sess.voltage_level = level
+                sess.commit()
+                self.bl_ext_levels[chan] = level
+                committed.append(sess)
+        for sess in committed:
+            sess.wait_for_event(nidcpower.Event.SOURCE_COMPLETE)
 
     def set_vwl(self, voltage):
         """Set (active) VWL using NI-DAQmx driver (inactive disabled)"""
-        # Select 8th and 9th bit to get the channel and the driver card, respectively
-        active_wl_chan = (self.addr >> 8) & 0b1
-        active_wl_dev = (self.addr >> 9) & 0b1
+        active_wl_chan = self.active_wl_chan
+        active_wl_dev = self.active_wl_dev
         active_wl = self.wl_ext_chans[active_wl_dev]
         inactive_wl = self.wl_ext_chans[1-active_wl_dev]
 
-        # Write voltage to hold
-        signal = [[(1-active_wl_chan)*voltage]*2, [active_wl_chan*voltage]*2]
-        inactive_wl.write([[0,0],[0,0]], auto_start=True)
-        inactive_wl.wait_until_done()
-        try:
-            inactive_wl.stop()
-        except nidaqmx.errors.DaqWarning:
-            pass
+        # Write voltage to hold (inactive card is skipped if it still holds its last zero sample)
+        signal = np.zeros((2, 2))
+        signal[active_wl_chan, :] = voltage
+        if not self.wl_ext_zero[1-active_wl_dev]:
+            inactive_wl.write(self.wl_zero_signal, auto_start=True)
+            inactive_wl.wait_until_done()
+            stop_task(inactive_wl)
         active_wl.write(signal, auto_start=True)
         active_wl.wait_until_done()
-        try:
-            active_wl.stop()
-        except nidaqmx.errors.DaqWarning:
-            pass
+        stop_task(active_wl)
+        self.wl_ext_zero[1-active_wl_dev] = True
+        self.wl_ext_zero[active_wl_dev] = voltage == 0
 
     def set_addr(self, addr):
         """Set the address and hold briefly"""
@@ -257,6 +284,11 @@ class NIRRAM:
         sl_addr = (self.addr >> 1) & 0b1111111
         wl_addr = (self.addr >> 10) & 0b111111
 
+        # LSB indicates active BL channel, 8th and 9th bit the WL channel and driver card
+        self.active_bl_chan = self.addr & 0b1
+        self.active_wl_chan = (self.addr >> 8) & 0b1
+        self.active_wl_dev = (self.addr >> 9) & 0b1
+
         # Write addresses to corresponding HSDIO channels
         self.hsdio.write_data_across_chans("sl_addr", sl_addr)
         self.hsdio.write_data_across_chans("wl_addr", wl_addr)
@@ -267,29 +299,30 @@ class NIRRAM:
 
     def pulse_vwl(self, voltage, pulse_width):
         """Pulse (active) VWL using NI-DAQmx driver (inactive disabled)"""
-        # Select 8th and 9th bit to get the channel and the driver card, respectively
-        active_wl_chan = (self.addr >> 8) & 0b1
-        active_wl_dev = (self.addr >> 9) & 0b1
+        active_wl_chan = self.active_wl_chan
+        active_wl_dev = self.active_wl_dev
         active_wl = self.wl_ext_chans[active_wl_dev]
         inactive_wl = self.wl_ext_chans[1-active_wl_dev]
 
-        # Configure pulse width
-        active_wl.timing.cfg_samp_clk_timing(1/pulse_width, samps_per_chan=2)
-
-        # Write pulse
-        signal = [[(1-active_wl_chan)*voltage, 0], [active_wl_chan*voltage, 0]]
-        inactive_wl.write([[0,0],[0,0]], auto_start=True)
-        inactive_wl.wait_until_done()
-        try:
-            inactive_wl.stop()
-        except nidaqmx.errors.DaqWarning:
-            pass
+        # Configure pulse width (timing is only reconfigured when it changes)
+        rate = 1/pulse_width
+        if self.wl_ext_rates[active_wl_dev] != rate:
+            active_wl.timing.cfg_samp_clk_timing(rate, samps_per_chan=2)
+            self.wl_ext_rates[active_wl_dev] = rate
+
+        # Write pulse (inactive card is skipped if it still holds its last zero sample)
+        signal = np.zeros((2, 2))
+        signal[active_wl_chan, 0] = voltage
+        if not self.wl_ext_zero[1-active_wl_dev]:
+            inactive_wl.write(self.wl_zero_signal, auto_start=True)
+            inactive_wl.wait_until_done()
+            stop_task(inactive_wl)
         active_wl.write(signal, auto_start=True)
         active_wl.wait_until_done()
-        try:
-            active_wl.stop()
-        except nidaqmx.errors.DaqWarning:
-            pass
+        stop_task(active_wl)
+
+        # Both cards end the pulse at zero
+        self.wl_ext_zero = [True]*len(self.wl_ext_chans)
 
     def decoder_enable(self):
         """Enable decoding circuitry using digital signals"""
@@ -304,6 +337,13 @@ class NIRRAM:
         self.hsdio.write_data_across_chans("wl_clk", 0b0)
 
 
+    def sweep(self, start, stop, step):
+        """Returns np.arange(start, stop, step), cached since pulse-verify loops reuse it"""
+        key = (start, stop, step)
+        if key not in self.sweeps:
+            self.sweeps[key] = np.arange(start, stop, step)
+        return self.sweeps[key]
+
     def dynamic_form(self, target_res=50000):
         """Performs SET pulses in increasing fashion until resistance reaches target_res.
         Returns tuple (res, cond, meas_i, meas_v, success)."""
@@ -314,17 +354,17 @@ class NIRRAM:
         Returns tuple (res, cond, meas_i, meas_v, success)."""
         # Get settings
         cfg = self.settings[scheme]
+        vwls = self.sweep(cfg["VWL_SET_start"], cfg["VWL_SET_stop"], cfg["VWL_SET_step"])
+        vbls = self.sweep(cfg["VBL_start"], cfg["VBL_stop"], cfg["VBL_step"])
+        pulse_width = cfg["SET_PW"]
 
         # Iterative pulse-verify
         success = False
-        for vwl in np.arange(cfg["VWL_SET_start"], cfg["VWL_SET_stop"], cfg["VWL_SET_step"]):
-            for vbl in np.arange(cfg["VBL_start"], cfg["VBL_stop"], cfg["VBL_step"]):
-                self.set_pulse(vwl, vbl, cfg["SET_PW"])
-                res, cond, meas_i, meas_v = self.read()
-                if res <= target_res:
-                    success = True
-                    break
-            if success:
+        for vwl, vbl in itertools.product(vwls, vbls):
+            self.set_pulse(vwl, vbl, pulse_width)
+            res, cond, meas_i, meas_v = self.read()
+            if res <= target_res:
+                success = True
                 break
 
         # Return results
@@ -335,17 +375,17 @@ class NIRRAM:
         Returns tuple (res, cond, meas_i, meas_v, success)."""
         # Get settings
         cfg = self.settings[scheme]
+        vwls = self.sweep(cfg["VWL_RESET_start"], cfg["VWL_RESET_stop"], cfg["VWL_RESET_step"])
+        vsls = self.sweep(cfg["VSL_start"], cfg["VSL_stop"], cfg["VSL_step"])
+        pulse_width = cfg["RESET_PW"]
 
         # Iterative pulse-verify
         success = False
-        for vwl in np.arange(cfg["VWL_RESET_start"], cfg["VWL_RESET_stop"], cfg["VWL_RESET_step"]):
-            for vsl in np.arange(cfg["VSL_start"], cfg["VSL_stop"], cfg["VSL_step"]):
-                self.reset_pulse(vwl, vsl, cfg["RESET_PW"])
-                res, cond, meas_i, meas_v = self.read()
-                if res >= target_res:
-                    success = True
-                    break
-            if success:
+        for vwl, vsl in itertools.product(vwls, vsls):
+            self.reset_pulse(vwl, vsl, pulse_width)
+            res, cond, meas_i, meas_v = self.read()
+            if res >= target_res:
+                success = True
                 break
 
         # Return results
@@ -354,10 +394,10 @@ class NIRRAM:
     def target(self, target_res_lo, target_res_hi, scheme="PINGPONG", max_attempts=25, debug=True):
         """Performs SET/RESET pulses in increasing fashion until target range is achieved.
         Returns tuple (res, cond, meas_i, meas_v, attempt, success)."""
-        # Iterative pulse-verify
+        # Iterative pulse-verify (dynamic SET/RESET end with a READ, so only the first is explicit)
         success = False
+        res, cond, meas_i, meas_v = self.read()
         for attempt in range(max_attempts):
-            res, cond, meas_i, meas_v = self.read()
             if debug:
                 print("ATTEMPT", attempt)
                 print("RES", res)
@@ -374,10 +414,11 @@ class NIRRAM:
                 break
 
         # Log results
-        self.plogfile.write(f"{self.addr},{self.chip},{scheme},")
-        self.plogfile.write(f"{target_res_lo},{target_res_hi},{res},")
-        self.plogfile.write(f"{self.prof['READs']},{self.prof['SETs']},{self.prof['RESETs']},")
-        self.plogfile.write(f"{success}\n")
+        prof = self.prof
+        self.plogfile.write(f"{self.addr},{self.chip},{scheme},"
+                            f"{target_res_lo},{target_res_hi},{res},"
+                            f"{prof['READs']},{prof['SETs']},{prof['RESETs']},"
+                            f"{success}\n")
 
         # Return results
         return res, cond, meas_i, meas_v, attempt, success
@@ -385,7 +426,7 @@ class NIRRAM:
     def target_g(self, target_g_lo, target_g_hi, scheme="PINGPONG", max_attempts=25, debug=True):
         """Performs SET/RESET pulses in increasing fashion until target range is achieved.
         Returns tuple (res, cond, meas_i, meas_v, attempt, success)."""
-        self.target(1/target_g_hi, 1/target_g_lo, scheme, max_attempts, debug)
+        return self.target(1/target_g_hi, 1/target_g_lo, scheme, max_attempts, debug)
 
 
     def close(self):
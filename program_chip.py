@@ -21,7 +21,8 @@ args = parser.parse_args()
 nisys = NIRRAM(args.chipname)
 
 # Read bitstream
-bitstream = open(args.bitstream).readlines()
+with open(args.bitstream) as bitstream_file:
+    bitstream = bitstream_file.readlines()
 
 # Do operation across cells
 for i in range(args.iterations):
@@ -9,10 +9,11 @@ parser.add_argument("outfile", help="file to output to")
 parser.add_argument("--start-addr", type=int, default=0, help="start address")
 parser.add_argument("--end-addr", type=int, default=65536, help="end address")
 parser.add_argument("--step-addr", type=int, default=1, help="address stride")
+parser.add_argument("--quiet", action="store_true", help="do not echo each measurement")
 args = parser.parse_args()
 
 # Open outfile
-outfile = open(args.outfile, "a")
+outfile = open(args.outfile, "a", buffering=1<<16)
 
 # Initialize NI system
 nisys = NIRRAM(args.chipname)
@@ -22,7 +23,8 @@ for addr in range(args.start_addr, args.end_addr, args.step_addr):
     nisys.set_addr(addr)
     read = nisys.read()
     outfile.write(f"{addr}\t{read[0]}\n")
-    print(f"{addr}\t{read[0]}")
+    if not args.quiet:
+        print(f"{addr}\t{read[0]}")
 
 # Shutdown
 outfile.close()
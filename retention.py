@@ -15,7 +15,7 @@ ADDR_STEP = 1
 RES_RANGE = (10416.666666666666,10167.830132110183)
 
 # Open output file
-outfile = open("data/badcellret.csv", "w")
+outfile = open("data/badcellret.csv", "w", buffering=1<<16)
 
 # Do operation across cells
 for i, addr in enumerate(range(ADDR_LO, ADDR_HI, ADDR_STEP)):
@@ -25,6 +25,7 @@ for i, addr in enumerate(range(ADDR_LO, ADDR_HI, ADDR_STEP)):
         outfile.write(f"{addr},{time.time()},{nisys.read()}\n")
         if j % 100 == 0:
             print(j)
+    outfile.flush()
 
 # Shutdown
 outfile.close()